@@ -6,69 +6,110 @@ License, v. 2.0. If a copy of the MPL was not distributed with this
 file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
+import os
 import queue
 import threading
-from multiprocessing import Event, Process, Queue
-from typing import Any, Dict, KeysView
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Event, Process
+from typing import Any, Callable, Dict, KeysView, List
 from typing import Optional as Opt
 from typing import Tuple
 
 from .config import Config
-from .errors import MockingbirdUndefinedBeak
-from .helpers import drain_queue
+from .errors import InvalidConfig, MockingbirdUndefinedBeak
 from .interfaces.beak import Beak
-from .interfaces.tcp_server_beak import TCPServerBeak
+from .ipc import BeakIO, ShmRing
 from .logger import configure_log
 
+# Slot size for rings carrying raw request/response text. Sized to hold
+# the largest request a TCP handler will buffer (16 KiB) plus framing.
+MSG_SLOT_SIZE = 16448
+
 
 class BeakManager:
     class BeakProcess:
-        def __init__(self, if_config: Config.Interface) -> None:
+        __slots__ = ('config', 'process', 'tx_q', 'running', 'stop_event')
+
+        def __init__(self, if_config: Config.Interface, depth: int) -> None:
             self.config = if_config
             self.process = Process()
-            self.tx_q = Queue(256)  # type: Queue[Tuple[Any, str]]
+            self.tx_q = ShmRing(capacity=depth, slot_size=MSG_SLOT_SIZE)
             self.running = False
             self.stop_event = Event()
 
-    def __init__(self, log_queue: queue.Queue, config: Config) -> None:
-        self._beak_procs = {}  # type: Dict[str,BeakManager.BeakProcess]
-
-        # All beaks share buffer to help increase FIFO fidelity
-        # Queue for interfaces to send received requests to mockingbird
-        self._rx_q = Queue(1024)  # type: Queue[Tuple[str, Any, str]]
-        # Queue for interfaces to register requests with mockingbird
-
-        self._rr_q = Queue(256)  # type:Queue[Tuple[str,Opt[str],Opt[str]]]
+    def __init__(self, log_queue: ShmRing, config: Config) -> None:
+        # Ring capacities come from the config's queue_depth knob; the tx
+        # and rr rings see a fraction of the rx traffic so they are sized
+        # down proportionally
+        depth = config.queue_depth
+        side_depth = max(depth // 4, 16)
+        self._side_depth = side_depth
+
+        interfaces = list(config.interfaces)
+        self._beak_procs = {
+            interface.name: BeakManager.BeakProcess(interface, side_depth)
+            for interface in interfaces
+        }  # type: Dict[str,BeakManager.BeakProcess]
+
+        if len(self._beak_procs) != len(interfaces):
+            raise InvalidConfig('Duplicate interface names in configuration')
+
+        # All beaks share buffer to help increase FIFO fidelity.
+        # Shared memory rings avoid the pickle and syscall cost that
+        # multiprocessing.Queue pays on every message, which matters on the
+        # rx path where every received TCP request passes through.
+        # Ring for interfaces to send received requests to mockingbird
+        self._rx_q = ShmRing(capacity=depth, slot_size=MSG_SLOT_SIZE)
+        # Ring for interfaces to register requests with mockingbird
+        self._rr_q = ShmRing(capacity=side_depth, slot_size=MSG_SLOT_SIZE)
         self._log_queue = log_queue
 
-        for interface in config.interfaces:
-            self.register_interface(interface)
+        # Index table so beaks can send a 2-byte int per message instead
+        # of re-encoding their interface-name string every time
+        self._interface_names = tuple(self._beak_procs)
 
     @property
-    def register_request_queue(self) -> Queue:
+    def register_request_queue(self) -> ShmRing:
         return self._rr_q
 
     @property
-    def request_queue(self) -> Queue:
+    def request_queue(self) -> ShmRing:
         return self._rx_q
 
     @property
     def interfaces(self) -> KeysView[str]:
         return self._beak_procs.keys()
 
-    def get_reponse_queue(self, interface: str) -> queue.Queue:
+    def resolve_interface(self, ident: Any) -> str:
+        """Map an interface-name index from a ring message back to a name.
+
+        Beaks send a small int index instead of the interface-name string
+        with every message. Plain names are passed through so queue-like
+        stand-ins that don't use the index table still work.
+        """
+
+        if isinstance(ident, int):
+            return self._interface_names[ident]
+        return ident
+
+    def get_reponse_queue(self, interface: str) -> ShmRing:
         return self._beak_procs[interface].tx_q
 
     def register_interface(self, if_config: Config.Interface) -> None:
-        self._beak_procs[if_config.name] = BeakManager.BeakProcess(if_config)
+        if if_config.name in self._beak_procs:
+            raise InvalidConfig(
+                "Interface '{}' is already registered".format(if_config.name))
+
+        self._beak_procs[if_config.name] = BeakManager.BeakProcess(
+            if_config, self._side_depth)
+        self._interface_names = tuple(self._beak_procs)
 
     def start_all(self) -> None:
-        for _, beak_proc in self._beak_procs.items():
-            if beak_proc.running:
-                continue
+        stopped = [beak_proc for beak_proc in self._beak_procs.values()
+                   if not beak_proc.running]
 
+        for beak_proc in stopped:
             beak_proc.stop_event.clear()
-            # interface.tx_q = Queue(256)
             beak_proc.process = Process(
                 target=beak_main,
                 args=(beak_proc.stop_event,
@@ -76,29 +117,62 @@ class BeakManager:
                       self._log_queue,
                       beak_proc.tx_q,
                       self._rx_q,
-                      self._rr_q))
-            beak_proc.process.start()
+                      self._rr_q,
+                      self._interface_names.index(beak_proc.config.name)))
+
+        # Process.start releases the GIL during the underlying clone/exec,
+        # so starting the children from a thread pool overlaps their OS-side
+        # setup and the user sees the max startup time instead of the sum
+        self._for_all_concurrently(
+            lambda beak_proc: beak_proc.process.start(), stopped)
+
+        for beak_proc in stopped:
             beak_proc.running = True
 
     def stop_all(self) -> None:
-        for _, beak_proc in self._beak_procs.items():
-            if not beak_proc.running:
-                continue
+        running = [beak_proc for beak_proc in self._beak_procs.values()
+                   if beak_proc.running]
 
+        for beak_proc in running:
             beak_proc.stop_event.set()
-            beak_proc.process.join()
+
+        # Join concurrently so total shutdown time is the slowest child's,
+        # not the sum of all of them
+        self._for_all_concurrently(
+            lambda beak_proc: beak_proc.process.join(), running)
+
+        for beak_proc in running:
             beak_proc.running = False
 
-        # Drain queues to prevent blocking when this process is joined
-        drain_queue(self._rr_q)
-        drain_queue(self._rx_q)
+        # Drain rings so stale messages don't survive into a restart.
+        # clear() retires all pending slots in O(1) instead of popping
+        # messages one at a time.
+        self._rr_q.clear()
+        self._rx_q.clear()
+
+    @staticmethod
+    def _for_all_concurrently(
+            func: 'Callable[[BeakManager.BeakProcess], None]',
+            beak_procs: 'List[BeakManager.BeakProcess]') -> None:
+        if not beak_procs:
+            return
+
+        if len(beak_procs) == 1:
+            func(beak_procs[0])
+            return
 
+        with ThreadPoolExecutor(max_workers=min(len(beak_procs), 8)) as pool:
+            # list() forces any exception raised in a worker to propagate
+            list(pool.map(func, beak_procs))
 
-def beak_main(stop: threading.Event, config: Config.Interface, log_q: Queue,
-              rx_q: Queue, tx_q: Queue, rr_q: Queue) -> None:
+
+def beak_main(stop: threading.Event, config: Config.Interface, log_q: ShmRing,
+              rx_q: ShmRing, tx_q: ShmRing, rr_q: ShmRing,
+              name_idx: Opt[int] = None) -> None:
     try:
         configure_log(log_q)
-        beak = create_beak(config, rx_q, tx_q, rr_q)
+        _pin_to_core(name_idx)
+        beak = create_beak(config, rx_q, tx_q, rr_q, name_idx)
 
         # Run the interface until stop signal received. The beak interfaces
         # run their own thread, so this thread is free to idle or possibly
@@ -109,35 +183,50 @@ def beak_main(stop: threading.Event, config: Config.Interface, log_q: Queue,
     except (KeyboardInterrupt, SystemExit):
         pass  # Prevent stack trace caused by keyboard interrupt
     finally:
-        # Drain queues so the parent process doesn't block while trying to
-        # join this process
-        drain_queue(rx_q)
+        # Detach from the shared memory rings. Unlike Queue there is no
+        # feeder thread to flush, so no draining is needed to keep the
+        # parent's join from blocking.
+        rx_q.close()
+        tx_q.close()
+        rr_q.close()
 
-        # Let parent thread handle the joining of these queues
-        tx_q.cancel_join_thread()
-        rr_q.cancel_join_thread()
 
+def _pin_to_core(name_idx: Opt[int]) -> None:
+    """Pin this beak process to a single core where the OS supports it.
 
-def create_beak(config: Config.Interface, rx_q: Queue, tx_q: Queue, rr_q: Queue) -> Beak:
-    # Create callable methods for Beak so that Beak is not dependant on the
-    # implementation of multiprocessing
-    def request(key: Any, msg: str) -> None:
-        tx_q.put((config.name, key, msg))
+    Beaks have a small working set (socket read, dict lookup, socket
+    write), so keeping each one on a fixed core avoids refilling cold
+    caches every time the scheduler migrates the process.
+    """
 
-    def receive(block: bool, timeout: Opt[float]) -> Opt[Tuple[Any, str]]:
-        try:
-            return rx_q.get(block, timeout)
-        except queue.Empty:
-            return None
+    if name_idx is None or not hasattr(os, 'sched_setaffinity'):
+        return
 
-    def register_request(request: str, response: Opt[str]) -> None:
-        rr_q.put((config.name, request, response))
+    cpu_count = os.cpu_count()
+    if not cpu_count:
+        return
 
-    def register_default_request(response: str) -> None:
-        rr_q.put((config.name, None, response))
+    try:
+        os.sched_setaffinity(0, {name_idx % cpu_count})
+    except OSError:
+        pass  # Restricted affinity masks are not worth failing a beak over
+
+
+def create_beak(config: Config.Interface, rx_q: ShmRing, tx_q: ShmRing,
+                rr_q: ShmRing, name_idx: Opt[int] = None) -> Beak:
+    # Identify this beak by its index in the manager's name table when one
+    # was assigned; serializing a small int per message is cheaper than
+    # re-encoding the name string every time
+    ident = config.name if name_idx is None else name_idx  # type: Any
+
+    # Bundle the rings behind BeakIO so Beak is not dependant on the
+    # implementation of multiprocessing
+    beak_io = BeakIO(ident, rx_q, tx_q, rr_q)
 
     if config.beak_type == 'tcp_server':
-        return TCPServerBeak(config, request, receive, register_request,
-                             register_default_request)
+        # Imported here so processes that never instantiate a TCP beak
+        # don't pay for pulling in socketserver
+        from .interfaces.tcp_server_beak import TCPServerBeak
+        return TCPServerBeak(config, beak_io)
 
     raise MockingbirdUndefinedBeak
@@ -6,45 +6,67 @@ License, v. 2.0. If a copy of the MPL was not distributed with this
 file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
-from typing import Any, Dict, ValuesView
-
-import schema as sch
-import yaml
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Tuple
 
 from .errors import ConfigIOError, InvalidConfig
 
-SAFE_STR_REG = sch.Regex(r'^[\w\d]+$')
-
-# Regex for validating ip addressses
-IP_REG = sch.Regex(
-    r'^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}'
-    r'(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$')
-
-TCP_SCHEMA = sch.Schema({
-    'type': 'tcp_server',
-    'address': IP_REG,
-    'port': sch.And(sch.Use(int), lambda n: 0 <= n <= 65535),
-    sch.Optional('line_ending', default="\n"): str,
-    sch.Optional('default_response', default=''): str,
-    # sch.Optional('latency', default=0): sch.And(sch.Use(int), lambda n: 0 <= n),
-    'requests': [{
-        'in': str,
-        'out': str,
-        # sch.Optional('delay', default=0): sch.And(sch.Use(int), lambda n: 0 <= n)
-    }]
-})
-
-SCHEMA = sch.Schema({
-    'interfaces': {
-        sch.And(str, SAFE_STR_REG): TCP_SCHEMA
-    },
-    sch.Optional('vars'): {
-        sch.And(str, SAFE_STR_REG): {
-            'init': sch.Or(str, int),
-            'type': str
+
+@lru_cache(maxsize=1)
+def _build_schema() -> Any:
+    """Build the config validation schema on first use.
+
+    schema (and the yaml import in parse_file) are the heaviest imports
+    atticus has. Deferring them to the first load call keeps them off the
+    interactive shell's startup path.
+    """
+
+    import re
+
+    import schema as sch
+
+    safe_str_reg = sch.Regex(r'^[\w\d]+$')
+
+    # Regex for validating ip addressses. ASCII matching skips the Unicode
+    # character-class machinery; dotted quads are ASCII by definition.
+    ip_reg = sch.Regex(
+        r'^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}'
+        r'(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$', flags=re.ASCII)
+
+    tcp_schema = sch.Schema({
+        'type': 'tcp_server',
+        'address': ip_reg,
+        'port': sch.And(sch.Use(int), lambda n: 0 <= n <= 65535),
+        sch.Optional('line_ending', default="\n"): str,
+        sch.Optional('default_response', default=''): str,
+        # sch.Optional('latency', default=0): sch.And(sch.Use(int), lambda n: 0 <= n),
+        'requests': [{
+            'in': str,
+            'out': str,
+            # sch.Optional('delay', default=0): sch.And(sch.Use(int), lambda n: 0 <= n)
+        }]
+    })
+
+    return sch.Schema({
+        'interfaces': {
+            sch.And(str, safe_str_reg): tcp_schema
+        },
+        sch.Optional('queue_depth', default=1024):
+            sch.And(sch.Use(int), lambda n: n > 0),
+        sch.Optional('vars'): {
+            sch.And(str, safe_str_reg): {
+                'init': sch.Or(str, int),
+                'type': str
+            }
         }
-    }
-})
+    })
+
+
+# Validated config dicts keyed by (absolute path, mtime_ns, size), so
+# reloading an unchanged file skips the YAML parse and schema validation
+_parse_cache = {}  # type: Dict[Tuple[str, int, int], Dict[str, Any]]
+_PARSE_CACHE_MAX = 128
 
 
 def parse_file(file_path: str) -> 'Config':
@@ -53,10 +75,48 @@ def parse_file(file_path: str) -> 'Config':
     Generates a config object which is returned to the caller
     """
 
+    import mmap
+    import os
+
+    import yaml
+
     try:
-        with open(file_path, 'r') as file:
-            config = yaml.safe_load(file)
-            return Config(SCHEMA.validate(config))
+        file_stat = os.stat(file_path)
+    except OSError as ex:
+        raise ConfigIOError(
+            "Unable to read file '{}'. {}".format(file_path, ex)) from ex
+
+    cache_key = (os.path.abspath(file_path),
+                 file_stat.st_mtime_ns, file_stat.st_size)
+    cached = _parse_cache.get(cache_key)
+    if cached is not None:
+        return Config(cached)
+
+    try:
+        # The C loader parses 10-20x faster than the pure-Python
+        # SafeLoader; fall back when libyaml isn't compiled in
+        from yaml import CSafeLoader as yaml_loader  # type: ignore
+    except ImportError:
+        from yaml import SafeLoader as yaml_loader  # type: ignore
+
+    try:
+        # Mapping the file lets the loader scan the OS page cache directly
+        # instead of first decoding the whole file into a Python str
+        with open(file_path, 'rb') as file:
+            try:
+                with mmap.mmap(file.fileno(), 0,
+                               access=mmap.ACCESS_READ) as mapped:
+                    config = yaml.load(mapped, Loader=yaml_loader)
+            except ValueError:  # Empty files can't be mapped
+                config = yaml.load(file, Loader=yaml_loader)
+
+            validated = _build_schema().validate(config)
+
+            if len(_parse_cache) >= _PARSE_CACHE_MAX:
+                _parse_cache.clear()
+            _parse_cache[cache_key] = validated
+
+            return Config(validated)
 
     except EnvironmentError as ex:
         raise ConfigIOError(
@@ -72,55 +132,48 @@ class Config:
     dictionary key accessors throughout Atticus everytime the Schema
     for the config changes. By having it stored as a class, changes
     may only require changing the Config class and not keys thoughout
-    the entire program and all subprocesses. It would be great to use
-    the dataclasses module in python but that was only added in 3.7
+    the entire program and all subprocesses.
     """
 
+    @dataclass(frozen=True, slots=True)
     class Var:
-        def __init__(self, name: str, var_config: Dict[str, str]) -> None:
-            self._name = name
-            self._init = var_config['init']
-            self._type = var_config['type']
-
-        @property
-        def name(self) -> str:
-            return self._name
-
-        @property
-        def initial_value(self) -> str:
-            return self._init
-
-        @property
-        def value_type(self) -> str:
-            return self._type
+        name: str
+        initial_value: Any
+        value_type: str
 
+    @dataclass(frozen=True, slots=True)
     class Interface:
-        def __init__(self, name: str, props: Dict[Any, Any]) -> None:
-            self._name = name
-            self._properties = props
-
-        @property
-        def name(self) -> str:
-            return self._name
-
-        @property
-        def props(self) -> Dict[Any, Any]:
-            return self._properties
+        name: str
+        props: Dict[Any, Any]
 
         @property
         def beak_type(self) -> str:
-            return self._properties['type']
+            return self.props['type']
 
     def __init__(self, config: Dict[str, Any]) -> None:
-        self._vars = {name: Config.Var(name, v_config)
+        self._vars = {name: Config.Var(name, v_config['init'],
+                                       v_config['type'])
                       for name, v_config in config.get('vars', {}).items()}
         self._interfaces = {name: Config.Interface(
             name, props) for name, props in config['interfaces'].items()}
 
+        # Cache the view tuples once. Config is immutable after parsing,
+        # and tuples iterate faster than dict_values views.
+        self._interfaces_tuple = tuple(self._interfaces.values())
+        self._vars_tuple = tuple(self._vars.values())
+
+        self._queue_depth = config.get('queue_depth', 1024)
+
+    @property
+    def interfaces(self) -> Tuple['Config.Interface', ...]:
+        return self._interfaces_tuple
+
     @property
-    def interfaces(self) -> ValuesView['Config.Interface']:
-        return self._interfaces.values()
+    def vars(self) -> Tuple['Config.Var', ...]:
+        return self._vars_tuple
 
     @property
-    def vars(self) -> ValuesView['Config.Var']:
-        return self._vars.values()
+    def queue_depth(self) -> int:
+        """Capacity of the rx message ring; other rings are sized from it."""
+
+        return self._queue_depth
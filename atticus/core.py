@@ -7,7 +7,7 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
 import re
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 from .config import parse_file
 from .errors import (MockingbirdAlreadyLoaded, MockingbirdInvalidName,
@@ -15,6 +15,19 @@ from .errors import (MockingbirdAlreadyLoaded, MockingbirdInvalidName,
                      MockingbirdRunning)
 from .mockingbird_process import MockingbirdProcess
 
+# Pattern for validating mockingbird names, compiled once instead of on
+# every load call
+NAME_REGEX = re.compile(r'^\w+$')
+
+# Bound once so status checks skip the class -> enum -> member attribute
+# chain on every call
+_RUNNING = MockingbirdProcess.Status.RUNNING
+
+# Canonical status payloads, one per enum member. status() hands out
+# copies so callers can't mutate the shared originals.
+_STATUS_RESP = {status: {'status': status.name}
+                for status in MockingbirdProcess.Status}
+
 
 class Atticus:
     """Provides the Atticus API."""
@@ -22,6 +35,9 @@ class Atticus:
     def __init__(self) -> None:
         """Atticus constructor."""
         self._mb_procs = {}  # type: Dict[str, MockingbirdProcess]
+        # Name tuple kept in sync with _mb_procs so frequent status polls
+        # from the shell don't rebuild a view per call
+        self._mb_names = ()  # type: Tuple[str, ...]
 
     def __del__(self) -> None:
         """Make sure all processes are stopped and joined nicely."""
@@ -31,7 +47,7 @@ class Atticus:
     def load(self, mb_name: str, file: str) -> None:
         """Load and parse the specified configuration file."""
 
-        if re.match(r'^\w+$', mb_name) is None:
+        if NAME_REGEX.match(mb_name) is None:
             raise MockingbirdInvalidName(mb_name)
 
         if mb_name in self._mb_procs:
@@ -40,26 +56,29 @@ class Atticus:
         config = parse_file(file)
 
         self._mb_procs[mb_name] = MockingbirdProcess(config, mb_name)
+        self._mb_names = tuple(self._mb_procs)
 
     def unload(self, mb_name: str) -> None:
         """Remove the mockingbird with the provided name."""
 
-        if mb_name not in self._mb_procs:
+        process = self._mb_procs.get(mb_name)
+        if process is None:
             raise MockingbirdNotFound(mb_name)
 
-        if self._mb_procs[mb_name].status is MockingbirdProcess.Status.RUNNING:
+        if process.status is _RUNNING:
             raise MockingbirdRunning(mb_name)
 
         del self._mb_procs[mb_name]
+        self._mb_names = tuple(self._mb_procs)
 
     def start(self, mb_name: str) -> None:
         """Start the simulator with the provided name."""
 
-        if mb_name not in self._mb_procs:
+        process = self._mb_procs.get(mb_name)
+        if process is None:
             raise MockingbirdNotFound(mb_name)
 
-        process = self._mb_procs[mb_name]
-        if process.status is MockingbirdProcess.Status.RUNNING:
+        if process.status is _RUNNING:
             raise MockingbirdRunning(mb_name)
 
         process.start()
@@ -67,11 +86,11 @@ class Atticus:
     def stop(self, mb_name: str) -> None:
         """Stop the simulator with the provided name."""
 
-        if mb_name not in self._mb_procs:
+        process = self._mb_procs.get(mb_name)
+        if process is None:
             raise MockingbirdNotFound(mb_name)
 
-        process = self._mb_procs[mb_name]
-        if process.status is not MockingbirdProcess.Status.RUNNING:
+        if process.status is not _RUNNING:
             raise MockingbirdNotRunning(mb_name)
 
         process.stop()
@@ -79,24 +98,38 @@ class Atticus:
     def stop_all(self) -> None:
         """Stop all _mb_processes."""
 
-        for mb_name, process in self._mb_procs.items():
-            if process.status is MockingbirdProcess.Status.RUNNING:
-                self.stop(mb_name)
+        running = [process for process in self._mb_procs.values()
+                   if process.status is _RUNNING]
+
+        # Signal every process before joining any so the shutdowns overlap
+        for process in running:
+            process.signal_stop()
+
+        for process in running:
+            process.join_stop()
+
+    @property
+    def mb_names(self) -> Tuple[str, ...]:
+        """Names of all loaded mockingbirds.
+
+        The cached tuple, so callers that only need the names (shell tab
+        completion, for one) don't pay for building status dicts.
+        """
+
+        return self._mb_names
 
     def status(self, *args: str) -> Dict[str, Dict[str, Any]]:
         """Return the status of mockingbirds."""
 
         statuses = {}
 
-        mb_names = args if args else self._mb_procs.keys()
+        mb_names = args if args else self._mb_names
 
         for mb_name in mb_names:
-            if mb_name not in self._mb_procs:
+            process = self._mb_procs.get(mb_name)
+            if process is None:
                 raise MockingbirdNotFound(mb_name)
 
-            process = self._mb_procs[mb_name]
-            statuses[mb_name] = {
-                'status': process.status.name
-            }
+            statuses[mb_name] = _STATUS_RESP[process.status].copy()
 
         return statuses
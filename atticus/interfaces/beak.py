@@ -10,26 +10,20 @@ import logging
 from abc import abstractmethod
 from threading import Event, Thread
 from types import TracebackType
-from typing import Any, Callable, Tuple, Type
+from typing import Any, Tuple, Type
 from typing import Optional as Opt  # Shorten name
 
 from ..config import Config
+from ..ipc import BeakIO
 
 
 class Beak:
     """Abstract class for creating interfaces used by the mockingbird."""
 
-    def __init__(self, config: Config.Interface,
-                 request: Callable[[Any, str], None],
-                 receive: Callable[[bool, Opt[float]], Opt[Tuple[Any, str]]],
-                 register_request: Callable[[str, Opt[str]], None],
-                 register_default_request: Callable[[str], None]) -> None:
+    def __init__(self, config: Config.Interface, beak_io: BeakIO) -> None:
         """The constructor for the Beak class."""
 
-        self.__request_func = request
-        self.__receive_func = receive
-        self.__register_request_func = register_request
-        self.__register_default_request_func = register_default_request
+        self.__io = beak_io
         self.__booted = Event()  # Indicates that startup process finished
         self.__io_thread = Thread(target=self.__io_loop)
 
@@ -100,17 +94,27 @@ class Beak:
 
     def _mb_request(self, key: Any, msg: str) -> None:
         # TODO: Allow request to be dropped if queue is full
-        self.__request_func(key, msg)
+        self.__io.request(key, msg)
 
     def _mb_receive(self, block: bool = True, timeout: Opt[float] = None
                     ) -> Opt[Tuple[Any, str]]:
-        return self.__receive_func(block, timeout)
+        return self.__io.receive(block, timeout)
+
+    def _mb_unblock_receive(self) -> None:
+        """Wake a thread blocked in an untimed _mb_receive call.
+
+        Interfaces whose consumer thread blocks on _mb_receive without a
+        timeout should call this during shutdown; the receive returns a
+        sentinel tuple whose first element is None.
+        """
+
+        self.__io.unblock_receive()
 
     def _mb_register_request(self, req: str, resp: Opt[str] = None) -> None:
-        self.__register_request_func(req, resp)
+        self.__io.register_request(req, resp)
 
     def _mb_register_default_request(self, resp: str) -> None:
-        self.__register_default_request_func(resp)
+        self.__io.register_default_request(resp)
 
     @abstractmethod
     def _boot_beak(self) -> None:
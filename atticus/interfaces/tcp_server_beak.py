@@ -8,10 +8,11 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 import errno
 import socket
+from itertools import count
+from queue import Empty, SimpleQueue
 from socketserver import BaseRequestHandler, ThreadingTCPServer
 from threading import Event, Thread
 from typing import Any, Callable, Dict
-from uuid import uuid4
 
 from .beak import Beak
 
@@ -39,8 +40,22 @@ class TCPServerBeak(Beak, ThreadingTCPServer):  # type: ignore
         self.consumer_thread = Thread(target=self.mb_receive_loop)
         self.bind_tries = TCPServerBeak.MAX_BIND_TRIES
 
+        # Client keys are small ints: cheaper to mint than uuid4 (no
+        # urandom syscall) and cheaper to hash on every respond() lookup
+        self.key_seq = count()
+
+        # Encoded once for all connections; handlers share this instead of
+        # re-encoding the configured line ending per connect
+        self.term = self._config.props['line_ending'].encode('utf8', 'ignore')
+
+        # Finished handlers return their Event (three objects: event,
+        # condition, lock) and receive buffer here so reconnecting clients
+        # reuse them instead of allocating fresh ones per connection
+        self.event_pool = SimpleQueue()  # type: SimpleQueue
+        self.buf_pool = SimpleQueue()  # type: SimpleQueue
+
     def _boot_beak(self) -> None:
-        if b'\\' in self._config.props['line_ending'].encode('utf8', 'ignore'):
+        if b'\\' in self.term:
             self._log.warning(
                 'Escaped characters detected in line ending.'
                 ' Wrap line ending in double quotes in YAML config.')
@@ -49,10 +64,22 @@ class TCPServerBeak(Beak, ThreadingTCPServer):  # type: ignore
 
         requests = self._config.props.get('requests', [])
         for request in requests:
-            self._mb_register_request(request['in'], request['out'])
+            # A template too large for a ring slot is skipped with an
+            # error rather than allowed to kill the io thread, which
+            # would leave start() waiting on the boot event forever
+            try:
+                self._mb_register_request(request['in'], request['out'])
+            except ValueError:
+                self._log.error(
+                    'Skipped registering request "%.50s...":'
+                    ' template exceeds the ring slot size', request['in'])
 
-        self._mb_register_default_request(
-            self._config.props['default_response'])
+        try:
+            self._mb_register_default_request(
+                self._config.props['default_response'])
+        except ValueError:
+            self._log.error('Skipped registering default response:'
+                            ' template exceeds the ring slot size')
 
         # TODO: Requests are not guaranteed to be actually registered by
         # mockingbird at this point. There should be some kind of confirmation
@@ -74,8 +101,16 @@ class TCPServerBeak(Beak, ThreadingTCPServer):  # type: ignore
     def _shutdown_beak(self) -> None:
         self._log.info('Shutting down server')
 
+        # Wake every handler blocked waiting on a response so they can
+        # observe the stop event immediately. Any client connecting after
+        # this sweep sees the already-set stop event at the top of its
+        # handle loop before it ever waits.
+        for handler in tuple(_TCPHandler.clients.values()):
+            handler.respond_event.set()
+
         # Stop consumer thread before server so consumer thread doesn't try to
         # send responses to no longer existing clients after server has stopped
+        self._mb_unblock_receive()
         self.consumer_thread.join()
 
         # Stop the server
@@ -86,8 +121,10 @@ class TCPServerBeak(Beak, ThreadingTCPServer):  # type: ignore
 
     def bind_with_incrementing_port(self) -> None:
         while True:
+            bound = False
             try:
                 self.server_bind()
+                bound = True
 
                 # Rarely, even when server bind succeeds, calling server
                 # activate fails with errno.EADDRINUSE.
@@ -99,7 +136,12 @@ class TCPServerBeak(Beak, ThreadingTCPServer):  # type: ignore
                     addr, port = self.server_address
                     self._log.warning('Failed to bind port %d', port)
                     self.server_address = (addr, port + 1)
-                    self.reset()
+
+                    # A failed bind leaves the socket unbound and reusable;
+                    # only an activate failure leaves it stuck on the busy
+                    # port and in need of a fresh socket
+                    if bound:
+                        self.reset()
                     self.bind_tries -= 1
                 else:
                     self._log.critical('Failed to bind to any port')
@@ -111,10 +153,14 @@ class TCPServerBeak(Beak, ThreadingTCPServer):  # type: ignore
                                     self.socket_type)
 
     def mb_receive_loop(self) -> None:
-        while not self._stop_event.is_set():
-            mb_response = self._mb_receive(True, 0.5)
-            if mb_response is not None:
-                _TCPHandler.respond(*mb_response)
+        # Block without a timeout rather than waking twice a second to
+        # poll the stop event; _shutdown_beak unblocks the receive with a
+        # sentinel whose key is None
+        while True:
+            mb_response = self._mb_receive(True, None)
+            if mb_response is None or mb_response[0] is None:
+                break
+            _TCPHandler.respond(*mb_response)
 
 
 class _TCPHandler(BaseRequestHandler):
@@ -130,96 +176,144 @@ class _TCPHandler(BaseRequestHandler):
     # can't crash the program by using all of the available memory
     MAX_BUFFER_SIZE = 16384
 
-    clients = {}  # type: Dict[str, '_TCPHandler']
+    clients = {}  # type: Dict[int, '_TCPHandler']
 
     @staticmethod
-    def respond(key: str, msg: str) -> None:
+    def respond(key: int, msg: str) -> None:
         """Allows server to respond to a client with a mockingbird response"""
         handler = _TCPHandler.clients.get(key, None)
 
         if handler is None:  # Connection was dropped
             return
 
-        handler.response = msg
+        # Encode once here, terminator included, so the handler thread can
+        # hand the kernel a single ready buffer without re-encoding or
+        # concatenating per send
+        handler.response = msg.encode('utf8', 'ignore') + handler.term
         handler.respond_event.set()
 
     def setup(self) -> None:
         self.config = self.server.config  # type: ignore
         self.log = self.server.log  # type: ignore
         self.stop_event = self.server._stop_event  # type: ignore
-        self.term = self.config.props['line_ending'].encode('utf8', 'ignore')
+        self.term = self.server.term  # type: ignore
 
-        self.key = str(uuid4())
+        self.key = next(self.server.key_seq)  # type: ignore
         _TCPHandler.clients[self.key] = self
-        self.respond_event = Event()
-        self.response = ''
+        self.response = b''
+
+        # Disable Nagle's algorithm. Responses are small framed messages
+        # sent one at a time; without this they can sit in the kernel
+        # waiting on a delayed ACK before going out.
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        # Reuse pooled state from finished connections where possible so
+        # connection churn doesn't allocate a fresh Event (plus its
+        # internal condition and lock) and 16 KiB buffer every time
+        try:
+            self.respond_event = self.server.event_pool.get_nowait()  # type: ignore
+        except Empty:
+            self.respond_event = Event()
+
+        # Persistent receive buffer. recv_into fills it in place so the
+        # read loop never allocates per-chunk bytes objects or pays a
+        # b''.join per request.
+        try:
+            self.read_buf = self.server.buf_pool.get_nowait()  # type: ignore
+        except Empty:
+            self.read_buf = bytearray(_TCPHandler.MAX_BUFFER_SIZE)
+        self.buf_view = memoryview(self.read_buf)
+
+        # The receive timeout never changes, so set SO_RCVTIMEO once per
+        # connection instead of issuing a setsockopt every loop iteration
+        self.request.settimeout(_TCPHandler.TIMEOUT)
 
         self.log.info("Client %s: %d connected", *self.client_address)
 
     def handle(self) -> None:
-        read_buffer = []
-        read_buffer_len = 0
-
-        while not self.stop_event.is_set():
-            self.request.settimeout(_TCPHandler.TIMEOUT)
-
-            try:
-                # Peek at data in buffer
-                peeked = self.request.recv(4096, socket.MSG_PEEK)
-
-                if not peeked:
-                    self.log.info("Client %s: %d disconnected",
-                                  *self.client_address)
+        # Bind hot-path names once. Every attribute access inside the
+        # loop is otherwise a dict or descriptor lookup per pass.
+        read_buf = self.read_buf
+        buf_view = self.buf_view
+        term = self.term
+        term_len = len(term)
+        request = self.request
+        log = self.log
+        client_address = self.client_address
+        stop_is_set = self.stop_event.is_set
+        respond_wait = self.respond_event.wait
+        respond_clear = self.respond_event.clear
+        mb_request = self.server._mb_request  # type: ignore
+        max_size = _TCPHandler.MAX_BUFFER_SIZE
+
+        # Number of bytes of a partial request already sitting in read_buf
+        tail = 0
+
+        while not stop_is_set():
+            # Check whether a complete request is already buffered. Doing
+            # the scan on our own buffer means each byte crosses the
+            # kernel boundary exactly once, instead of being peeked and
+            # then read again.
+            end_pos = read_buf.find(term, 0, tail)
+
+            if end_pos < 0:
+                # Disconnect client if read buffer is at its limit
+                if tail >= max_size:
+                    log.error(
+                        "Client %s: %d exceeded max buffer length.",
+                        *client_address)
                     return
 
-                # Find the position of the line ending if it exists.
-                # Otherwise throw exception
-                end_pos = peeked.index(self.term) + len(self.term)
-            except socket.timeout:
-                continue  # Try again from the top to check stop event
-            except ValueError:
-                # No line ending was detected in peeked data from socket.
-                # Take the data read so far and store it in a buffer
-
-                self.log.info('Received partial request from %s: %d. %s',
-                              *self.client_address, peeked)
-                read_buffer.append(self.request.recv(len(peeked)))
-                read_buffer_len += len(peeked)
+                try:
+                    read = request.recv_into(
+                        buf_view[tail:], max_size - tail)
+                except socket.timeout:
+                    continue  # Try again from the top to check stop event
 
-                # Disconnect client if read buffer is at its limit
-                if read_buffer_len >= _TCPHandler.MAX_BUFFER_SIZE:
-                    self.log.error(
-                        "Client %s: %d exceeded max buffer length.",
-                        *self.client_address)
+                if not read:
+                    log.info("Client %s: %d disconnected", *client_address)
                     return
 
+                tail += read
                 continue
 
-            # Read all characters into buffer until line ending
-            read_buffer.append(self.request.recv(end_pos))
-            read_bytes = b''.join(read_buffer)
+            # Decode straight from the buffer view, excluding the
+            # terminator by length. The frame ends at the first terminator
+            # occurrence, so slicing is exact and skips the intermediate
+            # bytes copy plus the rstrip copy per request.
+            request_data = str(buf_view[:end_pos], 'utf-8', 'ignore')
+            end_pos += term_len
 
-            self.log.info('Received request from %s: %d. %s',
-                          *self.client_address, read_bytes)
+            log.info('Received request from %s: %d. %s',
+                     *client_address, request_data)
 
             # Pass request data to mockingbird
-            request_data = read_bytes.rstrip(
-                self.term).decode('utf-8', 'ignore')
-            self.server._mb_request(self.key, request_data)  # type: ignore
-
-            # Wait for a response to be received.
-            # Poll stop event to ensure exit happens if event occurs
-            while not self.respond_event.wait(_TCPHandler.TIMEOUT):
-                if self.stop_event.is_set():
-                    return
+            mb_request(self.key, request_data)
 
-            self.request.sendall(self.response.encode(
-                'utf8', 'ignore') + self.term)
+            # Wait for a response to be received. No timeout: shutdown
+            # sets every handler's respond event, so a stop wakes this
+            # immediately instead of after up to half a second of polling
+            respond_wait()
+            if stop_is_set():
+                return
 
-            # Prepare for next request
-            self.respond_event.clear()
-            read_buffer.clear()
-            read_buffer_len = 0
+            request.sendall(self.response)
+
+            # Prepare for next request, keeping any bytes that arrived
+            # after the line ending
+            respond_clear()
+            residual = tail - end_pos
+            if residual:
+                read_buf[:residual] = read_buf[end_pos:tail]
+            tail = residual
 
     def finish(self) -> None:
         del _TCPHandler.clients[self.key]
+
+        # Return reusable state to the server pools for the next client.
+        # The view must be released first so the buffer isn't exported
+        # while another handler owns it.
+        self.buf_view.release()
+        self.server.buf_pool.put(self.read_buf)  # type: ignore
+        self.respond_event.clear()
+        self.server.event_pool.put(self.respond_event)  # type: ignore
@@ -0,0 +1,278 @@
+"""
+Copyright (c) 2020 Nathan Telles
+
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+import queue
+import struct
+from multiprocessing import Lock, Semaphore
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Tuple
+from typing import Optional as Opt
+
+# Offsets of the head and tail counters within the shared memory segment.
+# They are kept a cache line apart so the producer and consumer cores don't
+# invalidate each other's cache line on every message (false sharing).
+_HEAD_OFFSET = 0
+_TAIL_OFFSET = 64
+_SLOTS_OFFSET = 128
+
+_COUNTER = struct.Struct('<I')
+_FIELD_HEADER = struct.Struct('<I')
+
+# Length marker used to distinguish None from an empty string
+_NONE_FIELD = 0xFFFFFFFF
+# Length marker for a small-integer field (e.g. an interface-name index)
+_INT_FIELD = 0xFFFFFFFE
+_INT_VALUE = struct.Struct('<i')
+
+
+class BeakIO:
+    """Bundles a beak's message rings behind plain method calls.
+
+    Beaks talk to the mockingbird through this object so they stay
+    independent of the multiprocessing implementation. Bound methods on a
+    slotted instance dispatch faster than the closure-per-operation
+    approach they replace, and the struct travels to the child process as
+    one argument.
+    """
+
+    __slots__ = ('ident', 'rx_q', 'tx_q', 'rr_q')
+
+    def __init__(self, ident: Any, rx_q: 'ShmRing', tx_q: 'ShmRing',
+                 rr_q: 'ShmRing') -> None:
+        self.ident = ident
+        self.rx_q = rx_q
+        self.tx_q = tx_q
+        self.rr_q = rr_q
+
+    def request(self, key: Any, msg: str) -> None:
+        self.tx_q.put((self.ident, key, msg))
+
+    def receive(self, block: bool,
+                timeout: Opt[float]) -> Opt[Tuple[Any, str]]:
+        try:
+            return self.rx_q.get(block, timeout)  # type: ignore
+        except queue.Empty:
+            return None
+
+    def unblock_receive(self) -> None:
+        """Push a wakeup sentinel onto the receive ring.
+
+        Lets a consumer thread block on receive() without a timeout: at
+        shutdown this sentinel (None in the key position, which no real
+        response carries) wakes it instead of a periodic poll.
+        """
+
+        self.rx_q.put((None, None))
+
+    def register_request(self, request: str, response: Opt[str]) -> None:
+        self.rr_q.put((self.ident, request, response))
+
+    def register_default_request(self, response: str) -> None:
+        self.rr_q.put((self.ident, None, response))
+
+
+class ShmRing:
+    """Fixed-slot ring buffer over POSIX shared memory.
+
+    Replaces multiprocessing.Queue for the small, high-frequency message
+    tuples passed between beak processes and the mockingbird. Items are
+    written directly into a shared memory segment which avoids the pickle,
+    pipe-lock, and read/write syscall cost that Queue pays per message.
+
+    The ring is multi-producer (writes are serialized with a lock) and
+    single-consumer. The API intentionally mirrors the subset of the Queue
+    API used by atticus so the two are interchangeable.
+
+    Blocking rides on two semaphores counting filled and free slots, so a
+    waiting consumer is woken by the kernel the moment a message is
+    published instead of discovering it on a poll timer. The semaphore
+    handoff also orders the slot write before the consumer's read
+    (sem_post/sem_wait synchronize memory), which plain counter stores in
+    shared memory would not guarantee on weakly ordered CPUs.
+    """
+
+    def __init__(self, capacity: int = 1024, slot_size: int = 4096) -> None:
+        # Round up to a power of two so slot indexing can use a bitmask
+        # instead of a modulo on every put/get
+        self._capacity = 1 << (capacity - 1).bit_length()
+        self._mask = self._capacity - 1
+        self._slot_size = slot_size
+        self._shm = SharedMemory(
+            create=True, size=_SLOTS_OFFSET + self._capacity * slot_size)
+        buf = self._shm.buf
+        assert buf is not None  # Always set on a freshly mapped segment
+        self._buf = buf
+        self._put_lock = Lock()
+        self._filled = Semaphore(0)
+        self._free = Semaphore(self._capacity)
+        self._is_owner = True
+
+        _COUNTER.pack_into(self._buf, _HEAD_OFFSET, 0)
+        _COUNTER.pack_into(self._buf, _TAIL_OFFSET, 0)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (ShmRing._attach,
+                (self._shm.name, self._capacity, self._slot_size,
+                 self._put_lock, self._filled, self._free))
+
+    @classmethod
+    def _attach(cls, name: str, capacity: int, slot_size: int,
+                put_lock: Any, filled: Any, free: Any) -> 'ShmRing':
+        """Attach to an existing ring from another process."""
+
+        ring = cls.__new__(cls)
+        ring._capacity = capacity
+        ring._mask = capacity - 1
+        ring._slot_size = slot_size
+        ring._shm = SharedMemory(name=name)
+        buf = ring._shm.buf
+        assert buf is not None  # Always set on a freshly mapped segment
+        ring._buf = buf
+        ring._put_lock = put_lock
+        ring._filled = filled
+        ring._free = free
+        ring._is_owner = False
+        return ring
+
+    @property
+    def slot_size(self) -> int:
+        """Capacity in bytes of one slot, serialization overhead included."""
+
+        return self._slot_size
+
+    def put(self, item: Tuple[Any, ...], block: bool = True,
+            timeout: Opt[float] = None) -> None:
+        """Serialize item into the next free slot.
+
+        Raises queue.Full if the ring stays full past the timeout.
+        """
+
+        data = self._serialize(item)
+
+        # The free-slot semaphore is the full check: acquiring it reserves
+        # a slot, or blocks in the kernel until the consumer frees one
+        if not self._free.acquire(block, timeout):
+            raise queue.Full
+
+        with self._put_lock:
+            tail = _COUNTER.unpack_from(self._buf, _TAIL_OFFSET)[0]
+            slot = _SLOTS_OFFSET + (tail & self._mask) * self._slot_size
+            self._buf[slot:slot + len(data)] = data
+            _COUNTER.pack_into(self._buf, _TAIL_OFFSET,
+                               (tail + 1) & 0xFFFFFFFF)
+
+        # Publish after the slot write; the post/wait pair hands the
+        # filled slot to the consumer with the necessary memory ordering
+        self._filled.release()
+
+    def get(self, block: bool = True,
+            timeout: Opt[float] = None) -> Tuple[Any, ...]:
+        """Read the next item from the ring.
+
+        Raises queue.Empty if no item arrives within the timeout.
+        """
+
+        # Blocks in the kernel until a producer posts a filled slot; a
+        # post made before this wait is consumed without sleeping at all
+        if not self._filled.acquire(block, timeout):
+            raise queue.Empty
+
+        head = _COUNTER.unpack_from(self._buf, _HEAD_OFFSET)[0]
+        slot = _SLOTS_OFFSET + (head & self._mask) * self._slot_size
+        item = self._deserialize(slot)
+        _COUNTER.pack_into(self._buf, _HEAD_OFFSET,
+                           (head + 1) & 0xFFFFFFFF)
+
+        self._free.release()
+        return item
+
+    def get_nowait(self) -> Tuple[Any, ...]:
+        return self.get(False)
+
+    def clear(self) -> None:
+        """Discard all pending items.
+
+        Each published slot is retired by advancing the head counter,
+        skipping the deserialization a get_nowait loop would pay per
+        item. The semaphores are rebalanced one slot at a time so the
+        counts stay consistent with concurrent producers.
+        """
+
+        while self._filled.acquire(False):
+            head = _COUNTER.unpack_from(self._buf, _HEAD_OFFSET)[0]
+            _COUNTER.pack_into(self._buf, _HEAD_OFFSET,
+                               (head + 1) & 0xFFFFFFFF)
+            self._free.release()
+
+    def close(self) -> None:
+        """Detach from the shared memory segment.
+
+        The owning process also unlinks the segment so the OS can reclaim it.
+        """
+
+        if self._buf is None:
+            return
+
+        self._buf = None  # type: ignore
+        self._shm.close()
+        if self._is_owner:
+            self._shm.unlink()
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass  # Interpreter may be tearing down
+
+    def _serialize(self, item: Tuple[Any, ...]) -> bytes:
+        """Pack a tuple of strings, small ints, and Nones into
+        length-prefixed fields.
+
+        The message tuples atticus passes between processes only ever
+        contain these types, so a flat length-prefixed encoding is both
+        faster and smaller than pickling the tuple.
+        """
+
+        parts = [_FIELD_HEADER.pack(len(item))]
+        for field in item:
+            if field is None:
+                parts.append(_FIELD_HEADER.pack(_NONE_FIELD))
+            elif isinstance(field, int):
+                parts.append(_FIELD_HEADER.pack(_INT_FIELD))
+                parts.append(_INT_VALUE.pack(field))
+            else:
+                encoded = field.encode('utf-8')
+                parts.append(_FIELD_HEADER.pack(len(encoded)))
+                parts.append(encoded)
+
+        data = b''.join(parts)
+        if len(data) > self._slot_size:
+            raise ValueError(
+                'Message of {} bytes exceeds ring slot size of {}'.format(
+                    len(data), self._slot_size))
+        return data
+
+    def _deserialize(self, offset: int) -> Tuple[Any, ...]:
+        num_fields = _FIELD_HEADER.unpack_from(self._buf, offset)[0]
+        offset += _FIELD_HEADER.size
+
+        fields = []  # type: list
+        for _ in range(num_fields):
+            length = _FIELD_HEADER.unpack_from(self._buf, offset)[0]
+            offset += _FIELD_HEADER.size
+            if length == _NONE_FIELD:
+                fields.append(None)
+            elif length == _INT_FIELD:
+                fields.append(_INT_VALUE.unpack_from(self._buf, offset)[0])
+                offset += _INT_VALUE.size
+            else:
+                fields.append(
+                    bytes(self._buf[offset:offset + length]).decode('utf-8'))
+                offset += length
+
+        return tuple(fields)
@@ -8,22 +8,72 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 import logging
 import logging.handlers
-from multiprocessing import Queue
+import queue
 
+from .ipc import ShmRing
 
-def logger_main(queue: Queue, name: str) -> None:
+# Sentinel tuple that tells the logger process to exit
+LOG_STOP = (None, None, None)
+
+# Formatter used only to render exception tracebacks into the message
+# before it crosses the process boundary
+_EXC_FORMATTER = logging.Formatter()
+
+# File output format, built once at import instead of per configure call
+_FILE_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+
+
+class ShmRingLogHandler(logging.Handler):
+    """Ship log records across processes through a shared memory ring.
+
+    Records are flattened to a (name, level, message) tuple with args and
+    any traceback already rendered in, so the receiving side never pays
+    for pickling LogRecord objects the way a QueueHandler transport does.
+    """
+
+    def __init__(self, ring: ShmRing) -> None:
+        super().__init__()
+        self._ring = ring
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            msg = record.getMessage()
+            if record.exc_info:
+                msg = '{}\n{}'.format(
+                    msg, _EXC_FORMATTER.formatException(record.exc_info))
+
+            self._ring.put((record.name, record.levelno, msg), timeout=0.25)
+        except (queue.Full, ValueError):
+            pass  # Drop records rather than stall the hot path
+        except Exception:
+            self.handleError(record)
+
+
+def logger_main(log_ring: ShmRing, name: str) -> None:
 
     _listener_configure(name)
+
+    # getLogger takes the logging manager's lock on every call; cache the
+    # logger per name so steady-state records skip it
+    loggers = {}  # type: dict
     while True:
         try:
-            record = queue.get()
-            if record is None:  # Send None to the logger to exit the process
+            log_name, level, msg = log_ring.get()
+            if log_name is None:  # Send LOG_STOP to exit the process
                 break
-            logger = logging.getLogger(record.name)
+            record = logging.LogRecord(
+                log_name, level, '', 0, msg, None, None)
+            logger = loggers.get(log_name)
+            if logger is None:
+                logger = loggers[log_name] = logging.getLogger(log_name)
             logger.handle(record)
         except (KeyboardInterrupt, SystemExit):
             pass  # Parent thread will handle stopping the logger process
 
+    # Push anything still buffered in the memory handler to the file
+    logging.shutdown()
+
 
 def _listener_configure(name: str) -> None:
     """Configure root log that all other loggers pass up to."""
@@ -38,14 +88,18 @@ def _listener_configure(name: str) -> None:
     # Rotate log files with a max size of 5MB per file
     handler = logging.handlers.RotatingFileHandler(filename + '.log',
                                                    maxBytes=5242880, backupCount=5)
-    formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(name)s - %(message)s')
-    handler.setFormatter(formatter)
-    root.addHandler(handler)
+    handler.setFormatter(_FILE_FORMATTER)
+
+    # Buffer records and flush in batches so steady-state logging pays
+    # one write per batch instead of per record. Errors and worse flush
+    # immediately so they hit the file before a potential crash.
+    mem_handler = logging.handlers.MemoryHandler(
+        capacity=512, flushLevel=logging.ERROR, target=handler)
+    root.addHandler(mem_handler)
 
 
-def configure_log(log_q: Queue) -> None:
-    handler = logging.handlers.QueueHandler(log_q)
+def configure_log(log_ring: ShmRing) -> None:
+    handler = ShmRingLogHandler(log_ring)
     logger = logging.getLogger()
 
     # If multiprocessing is using fork (the default on Unix) instead of spawn,
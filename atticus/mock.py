@@ -8,21 +8,24 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 import logging
 import threading
-from multiprocessing import Process, Queue
-from typing import Optional
+from multiprocessing import Process
 
 from .config import Config
-from .helpers import drain_queue
-from .logger import configure_log, logger_main
+from .ipc import ShmRing
+from .logger import LOG_STOP, configure_log, logger_main
 from .mockingbird import Mockingbird
 
+# Slot size for the log ring. Big enough for messages that embed a full
+# request or a rendered traceback.
+LOG_SLOT_SIZE = 16448
+
 
 def mock_main(stop: threading.Event, config: Config, mb_name: str) -> None:
     """Main function loop for Mockingbird process."""
 
     try:
         # Create the logging process
-        log_q = Queue()  # type: Queue[Optional[logging.LogRecord]]
+        log_q = ShmRing(capacity=1024, slot_size=LOG_SLOT_SIZE)
         log_process = Process(target=logger_main, args=(log_q, mb_name))
         log_process.start()
 
@@ -44,14 +47,13 @@ def mock_main(stop: threading.Event, config: Config, mb_name: str) -> None:
         except NameError:
             pass  # Log wan't defined yet
         try:  # Attempt to stop logging process when exiting
-            log_q.put(None)
+            log_q.put(LOG_STOP)
             log_process.join(5)
         except NameError:
             pass  # log_q or log_process weren't defined yet
         try:
-            # The log queue can still have stuff in it if the log process was
-            # never started. Drain the queue to keep joining the process from
-            # blocking
-            drain_queue(log_q)
+            # Unlike a Queue there is no feeder thread to flush, so pending
+            # records can't block the join; just detach from the ring
+            log_q.close()
         except NameError:
             pass
@@ -7,15 +7,16 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
 import logging
-import queue
-import random
 import re
 import time
 from collections import namedtuple
-from queue import Queue
-from threading import RLock, Thread
+from functools import lru_cache
+from heapq import heappop, heappush
+from itertools import count
+from operator import itemgetter
+from threading import Condition, RLock, Thread
 from types import TracebackType
-from typing import Any, Dict, List, Tuple, Type
+from typing import Any, Callable, Dict, List, Tuple, Type
 from typing import Optional as Opt
 
 import parse
@@ -23,14 +24,14 @@ import parse
 from .beak_manager import BeakManager
 from .config import Config
 from .errors import MockingbirdError, MockingbirdUndefinedVar
+from .ipc import ShmRing
 
 # Match variables in strings such as "$(my_var). Capture variable name."
 VAR_REGEX = re.compile(r'\$\(([\w\d]+)\)')
-# Match sets of opening and closing curly braces.
-BRACES_REGEX = re.compile(r'{+|}+')
 
 
-def _transform_formatter_syntax(string: str) -> Tuple[str, List[str]]:
+@lru_cache(maxsize=2048)
+def _transform_formatter_syntax(string: str) -> Tuple[str, Tuple[str, ...]]:
     """Transform text from mockingbird syntax to the formatter syntax"""
 
     mb_vars = _parse_variables(string)
@@ -40,7 +41,8 @@ def _transform_formatter_syntax(string: str) -> Tuple[str, List[str]]:
     return (VAR_REGEX.sub(r'{}', esc_string), mb_vars)
 
 
-def _transform_parse_syntax(string: str) -> Tuple[str, List[str]]:
+@lru_cache(maxsize=2048)
+def _transform_parse_syntax(string: str) -> Tuple[str, Tuple[str, ...]]:
     """Transform text from mockingbird syntax to the parse module syntax"""
 
     mb_vars = _parse_variables(string)
@@ -50,32 +52,109 @@ def _transform_parse_syntax(string: str) -> Tuple[str, List[str]]:
     return (VAR_REGEX.sub(r'{}', esc_string), mb_vars)
 
 
+@lru_cache(maxsize=2048)
 def _escape_curly_braces(string: str) -> str:
-    """Escape curly braces by doubling the number of them."""
+    """Escape curly braces by doubling the number of them.
 
-    return BRACES_REGEX.sub(r'\g<0>\g<0>', string)
+    str.replace runs in C and doubling each brace individually produces
+    the same result as doubling whole runs, so no regex is needed.
+    """
 
+    return string.replace('{', '{{').replace('}', '}}')
 
-def _parse_variables(string: str) -> List[str]:
-    """Get list of vars in string. List vars are in same order as string."""
 
-    return VAR_REGEX.findall(string)
+@lru_cache(maxsize=2048)
+def _parse_variables(string: str) -> Tuple[str, ...]:
+    """Get tuple of vars in string. Vars are in same order as string.
+
+    A tuple (rather than a list) so the cached value can be shared
+    safely between every caller that transforms the same raw string.
+    """
+
+    return tuple(VAR_REGEX.findall(string))
+
+
+@lru_cache(maxsize=1024)
+def _compile_fast_request(raw_req: str) -> Opt['re.Pattern']:
+    """Compile a plain regex for templates the parse library isn't needed for.
+
+    Templates with no literal braces are just literal text around $(var)
+    captures. For those, parse generates the pattern
+    \\A<literals>(.+?)<literals>\\Z under IGNORECASE | DOTALL, which a
+    direct re.compile reproduces exactly at a fraction of the per-match
+    cost. Returns None when the template needs the parse library.
+    """
+
+    if '{' in raw_req or '}' in raw_req:
+        return None
+
+    parts = VAR_REGEX.split(raw_req)
+    pattern = ''.join('(.+?)' if index % 2 else re.escape(part)
+                      for index, part in enumerate(parts))
+    return re.compile(r'\A' + pattern + r'\Z', re.IGNORECASE | re.DOTALL)
+
+
+@lru_cache(maxsize=1024)
+def _compile_parse(template: str) -> 'parse.Parser':
+    """Compile a transformed template, sharing the result per template.
+
+    parse.compile rebuilds its regex from scratch on every call, so
+    registering the same pattern again (multiple interfaces, reloads)
+    repaid the full compile cost each time. Identical templates now share
+    one compiled parser.
+    """
+
+    return parse.compile(template)
 
 
 class _Request:
+    __slots__ = ('_delay', '_raw_request', '_request_parser', '_req_vars',
+                 '_fast_re', '_literal_req', '_raw_response', '_response',
+                 '_resp_vars', '_format', '_static_response',
+                 '_resp_getter', '_single_resp_var')
+
     def __init__(self, raw_request: str, raw_response: Opt[str]) -> None:
         self._delay = 0
         self._raw_request = raw_request
         self._request_parser, self._req_vars = self._build_request(raw_request)
+        self._fast_re = _compile_fast_request(raw_request)
+
+        # Variable-free templates that qualify for the regex fast path can
+        # short-circuit on string equality first; the regex only runs for
+        # the case-insensitive near-misses
+        self._literal_req = raw_request \
+            if self._fast_re is not None and not self._req_vars else None
 
         self._raw_response = raw_response
-        self._response, self._resp_vars = _transform_formatter_syntax(
-            raw_response) if raw_response is not None else (None, [])
+        self._response = None  # type: Opt[str]
+        self._resp_vars = ()  # type: Tuple[str, ...]
+        if raw_response is not None:
+            self._response, self._resp_vars = _transform_formatter_syntax(
+                raw_response)
+
+        # Specialize the response path at construction time: responses
+        # without variables are rendered once here, and the format method
+        # is pre-bound for those that do have variables
+        self._format = None  # type: Opt[Callable[..., str]]
+        self._static_response = None  # type: Opt[str]
+        self._resp_getter = None  # type: Opt[Callable[[Dict[str, Any]], Any]]
+        self._single_resp_var = False
+
+        if self._response is not None and self._resp_vars:
+            self._format = self._response.format
+
+            # One C-level bulk fetch of every referenced var per response
+            # instead of a dict lookup per var in Python
+            self._resp_getter = itemgetter(*self._resp_vars)
+            self._single_resp_var = len(self._resp_vars) == 1
+        elif self._response is not None:
+            self._static_response = self._response.format()
 
     @classmethod
-    def _build_request(self, raw_req: str) -> Tuple['parse.Parse', List[str]]:
+    def _build_request(self, raw_req: str
+                       ) -> Tuple['parse.Parse', Tuple[str, ...]]:
         req, req_vars = _transform_parse_syntax(raw_req)
-        return (parse.compile(req), req_vars)
+        return (_compile_parse(req), req_vars)
 
     @property
     def delay(self) -> int:
@@ -88,6 +167,16 @@ class _Request:
         Otherwise return dictionary of var names and values parsed from the
         request.
         """
+        if self._literal_req is not None and request == self._literal_req:
+            return {}
+
+        fast_re = self._fast_re
+        if fast_re is not None:
+            match = fast_re.match(request)
+            if match is None:
+                return None
+            return dict(zip(self._req_vars, match.groups()))
+
         vals = self._request_parser.parse(request)
         mb_vars = self._req_vars
 
@@ -98,38 +187,90 @@ class _Request:
             # Not sure how this could happen, but make sure it doesn't
             raise MockingbirdError
 
-        # Convert result to dictionary
-        return {mb_vars[i]: vals.fixed[i] for i in range(len(mb_vars))}
+        # Convert result to dictionary. zip dispatches to C instead of
+        # indexing both sequences per iteration.
+        return dict(zip(mb_vars, vals.fixed))
 
     def build_response(self, mb_vars: Dict[str, '_Var']) -> Opt[str]:
-        if self._response is None:
-            return None
+        fmt = self._format
+        resp_getter = self._resp_getter
+        if fmt is None or resp_getter is None:
+            # Covers both no-response requests (None) and responses with
+            # no variables (rendered once at construction)
+            return self._static_response
+
+        # itemgetter returns the single var directly when there's only one
+        mb_var_vals = resp_getter(mb_vars)
+        if self._single_resp_var:
+            return fmt(mb_var_vals.value)
 
-        vals = [mb_vars[resp_var].value for resp_var in self._resp_vars]
-        return self._response.format(*vals)
+        return fmt(*[var.value for var in mb_var_vals])
 
 
 class _Var:
+    """A mockingbird variable.
+
+    Reads and writes are single attribute accesses, which the GIL
+    already makes atomic, so no lock is needed around them.
+    """
+
+    __slots__ = ('_var_type', 'value')
+
     def __init__(self, var_type: str, value: Any) -> None:
         self._var_type = var_type
-        self._value = value
-        self._lock = RLock()
+        self.value = value
 
-    @property
-    def value(self) -> Any:
-        with self._lock:
-            return self._value
 
-    @value.setter
-    def value(self, value: Any) -> None:
-        with self._lock:
-            self._value = value
+class _ResponseSchedule:
+    """Deadline-ordered queue of scheduled responses.
+
+    The response path is single-producer/single-consumer, so a plain
+    heap under one condition variable replaces Queue's lock plus
+    condition machinery, and get() additionally honors each entry's
+    respond time: the consumer sleeps exactly until the earliest
+    deadline instead of popping in FIFO order.
+    """
+
+    __slots__ = ('_heap', '_cv', '_seq')
+
+    def __init__(self) -> None:
+        self._heap = []  # type: List[Tuple[float, int, tuple]]
+        self._cv = Condition()
+        # Tie-breaker so the heap never falls back to comparing payload
+        # fields when two entries share a respond time
+        self._seq = count()
+
+    def put(self, item: Tuple[float, Any, Any, Any]) -> None:
+        with self._cv:
+            heappush(self._heap, (item[0], next(self._seq), item))
+            self._cv.notify()
+
+    def get(self) -> Tuple[float, Any, Any, Any]:
+        """Block until the earliest scheduled entry is due, then pop it."""
+
+        with self._cv:
+            while True:
+                while not self._heap:
+                    self._cv.wait()
+
+                delay = self._heap[0][0] - time.time()
+                if delay <= 0:
+                    return heappop(self._heap)[2]
+
+                # Wait out the head entry's remaining delay; an earlier
+                # put() will notify and re-evaluate the new head
+                self._cv.wait(delay)
 
 
 class Mockingbird:
     """Class that holds the API for simulating the device."""
 
-    def __init__(self, mb_name: str, log_q: Queue, config: Config) -> None:
+    __slots__ = ('_beak_manager', '_log', '_mb_vars', '_requests',
+                 '_default_responses', '_response_queue',
+                 '_register_requests_thread', '_request_thread',
+                 '_respond_thread', '_verified')
+
+    def __init__(self, mb_name: str, log_q: ShmRing, config: Config) -> None:
         """Construct mockingbird."""
 
         LockedList = namedtuple('LockedList', 'lock, list')
@@ -149,15 +290,18 @@ class Mockingbird:
             RLock(), []) for name in self._beak_manager.interfaces}
         self._default_responses = {}  # type: Dict[str, _Request]
 
-        # Threadsafe queue for holding response events
-        self._response_queue = Queue(
-        )  # type: Queue[Tuple[float,str,Any,_Request]]
+        # Raw strings whose variables have already been checked against
+        # _mb_vars. The var table never changes after construction, so a
+        # verified string stays verified.
+        self._verified = set()  # type: set
+
+        # Threadsafe deadline-ordered queue for holding response events
+        self._response_queue = _ResponseSchedule()
 
         self._register_requests_thread = Thread(
             target=self._register_requests_loop)
         self._request_thread = Thread(target=self._request_loop)
         self._respond_thread = Thread(target=self._respond_loop)
-        self._stop = False
 
     def __enter__(self) -> 'Mockingbird':
         self.start()
@@ -169,13 +313,17 @@ class Mockingbird:
 
     def start(self) -> None:
         self._beak_manager.start_all()
-        self._stop = False
         self._register_requests_thread.start()
         self._request_thread.start()
         self._respond_thread.start()
 
     def stop(self) -> None:
-        self._stop = True
+        # The io loops block on their queues without timeouts, so push a
+        # sentinel (None in the interface position, which no real message
+        # carries) into each to wake and stop them
+        self._beak_manager.register_request_queue.put((None, None, None))
+        self._beak_manager.request_queue.put((None, None, None))
+        self._response_queue.put((0, None, None, None))
 
         # Stop io loops before beak manager to avoid race conditions
         self._register_requests_thread.join()
@@ -185,12 +333,18 @@ class Mockingbird:
         self._beak_manager.stop_all()
 
     def _register_requests_loop(self) -> None:
-        while not self._stop:
+        # Queue and dispatch methods bound once; attribute chains cost a
+        # lookup per iteration where locals are single bytecodes
+        get = self._beak_manager.register_request_queue.get
+        resolve = self._beak_manager.resolve_interface
+        register = self._register_request
+
+        while True:
             try:
-                req = self._beak_manager.register_request_queue.get(True, 0.1)
-                self._register_request(*req)
-            except queue.Empty:
-                pass
+                req = get()
+                if req[0] is None:  # Sentinel pushed by stop()
+                    break
+                register(resolve(req[0]), *req[1:])
             except Exception:
                 self._log.exception('Register requests thread crashed')
                 raise
@@ -233,12 +387,16 @@ class Mockingbird:
         return _Request(raw_req, raw_resp)
 
     def _request_loop(self) -> None:
-        while not self._stop:
+        get = self._beak_manager.request_queue.get
+        resolve = self._beak_manager.resolve_interface
+        handle = self._request
+
+        while True:
             try:
-                req = self._beak_manager.request_queue.get(True, 0.1)
-                self._request(*req)
-            except queue.Empty:
-                pass
+                req = get()
+                if req[0] is None:  # Sentinel pushed by stop()
+                    break
+                handle(resolve(req[0]), *req[1:])
             except Exception:
                 self._log.exception('Request handler thread crashed')
                 raise
@@ -246,64 +404,111 @@ class Mockingbird:
     def _request(self, beak: str, key: Any, req: str) -> None:
         """Make request to the Mockingbird. Output the response."""
 
-        self._log.info('Received request "%s" from %s',
-                       req, beak)
-
-        with self._requests[beak].lock:
-            beak_requests = self._requests[beak].list
-
-            # Shuffle interface reqs so that on average each request takes
-            # the same amount of time to find in the list. This keeps requests
-            # that appear earlier in the list from always being completed
-            # faster than requests found later in the list.
-            random.shuffle(beak_requests)
-
-            # Find the Request that matches the incoming request and parse it
-            matching_request = None
-            val_map = None
-            for registered_request in beak_requests:
-                val_map = registered_request.parse(req)
-
-                if val_map is not None:  # Found a matching request
-                    matching_request = registered_request
-                    break
-            else:
-                # Request didn't match any registered requests
-                self._log.info(
-                    'No match found for request "%s"', req)
-
-                matching_request = self._default_responses.get(beak, None)
-
-            if matching_request is None:
-                return
-
-            # Set the values parsed from the request
-            if val_map is not None:
-                for mb_var, val in val_map.items():
-                    self._mb_vars[mb_var].value = val
+        log = self._log
+        if log.isEnabledFor(logging.INFO):
+            log.info('Received request "%s" from %s', req, beak)
+
+        locked_requests = self._requests[beak]
+
+        # Snapshot the list so the expensive matching loop runs without
+        # the lock. _Request objects are immutable after creation, so the
+        # tuple copy is all that needs protecting; registration and other
+        # requests on this interface proceed while we match.
+        with locked_requests.lock:
+            beak_requests = tuple(locked_requests.list)
+
+        # Find the Request that matches the incoming request and parse
+        # it. Matches are moved to the front of the list so repeated
+        # requests are found on the first probe; this replaces the old
+        # per-request shuffle, which paid an O(n) pass plus n RNG
+        # calls before every scan just to equalize average depth.
+        matching_request = None
+        val_map = None
+        for registered_request in beak_requests:
+            val_map = registered_request.parse(req)
+
+            if val_map is not None:  # Found a matching request
+                matching_request = registered_request
+                break
+        else:
+            # Request didn't match any registered requests. Falling back
+            # to the default response is expected behavior, so this is
+            # debug rather than info.
+            log.debug('No match found for request "%s"', req)
+
+            matching_request = self._default_responses.get(beak, None)
+
+        if matching_request is None:
+            return
 
-            # Schedule the request to be responded to
-            respond_time = time.time() + matching_request.delay
-            self._response_queue.put(
-                (respond_time, beak, key, matching_request))
+        # Move the match to the front under a second short lock. The
+        # index is re-resolved because the list may have changed since
+        # the snapshot.
+        if val_map is not None and beak_requests[0] is not matching_request:
+            with locked_requests.lock:
+                requests_list = locked_requests.list
+                try:
+                    index = requests_list.index(matching_request)
+                except ValueError:
+                    pass  # No longer registered; nothing to reorder
+                else:
+                    if index:
+                        del requests_list[index]
+                        requests_list.insert(0, matching_request)
+
+        # Set the values parsed from the request
+        if val_map is not None:
+            for mb_var, val in val_map.items():
+                self._mb_vars[mb_var].value = val
+
+        # Schedule the request to be responded to
+        respond_time = time.time() + matching_request.delay
+        self._response_queue.put(
+            (respond_time, beak, key, matching_request))
 
     def _verify_vars_defined(self, raw_string: str) -> None:
         """Raises exception if any variable in string hasn't been defined."""
 
+        if raw_string in self._verified:
+            return
+
         for mb_var in _parse_variables(raw_string):
             if mb_var not in self._mb_vars:
                 raise MockingbirdUndefinedVar(mb_var)
 
+        self._verified.add(raw_string)
+
     def _respond_loop(self) -> None:
-        while not self._stop:
+        get = self._response_queue.get
+        response_queue_for = self._beak_manager.get_reponse_queue
+        mb_vars = self._mb_vars
+        log_info = self._log.info
+        info_enabled = self._log.isEnabledFor(logging.INFO)
+
+        while True:
             try:
-                _, beak, key, match_req = self._response_queue.get(True, 0.1)
-                beak_queue = self._beak_manager.get_reponse_queue(beak)
-                response = match_req.build_response(self._mb_vars)
-                beak_queue.put((key, response))
-                self._log.info('Sending response "%s" to "%s"', response, beak)
-            except queue.Empty:
-                pass
+                _, beak, key, match_req = get()
+                if beak is None:  # Sentinel pushed by stop()
+                    break
+                beak_queue = response_queue_for(beak)
+                response = match_req.build_response(mb_vars)
+                try:
+                    beak_queue.put((key, response))
+                except ValueError:
+                    # A rendered response can outgrow a ring slot (variable
+                    # values come from client input). The client handler is
+                    # blocked waiting on this key, so respond with as much
+                    # as fits rather than drop the response and leave the
+                    # handler waiting forever. 64 bytes of headroom covers
+                    # the serialization headers and the key field.
+                    self._log.error(
+                        'Truncated response of %d bytes for "%s":'
+                        ' exceeds the ring slot size', len(response), beak)
+                    encoded = response.encode('utf-8')
+                    encoded = encoded[:beak_queue.slot_size - 64]
+                    beak_queue.put((key, encoded.decode('utf-8', 'ignore')))
+                if info_enabled:
+                    log_info('Sending response "%s" to "%s"', response, beak)
             except Exception:
                 self._log.exception('Response handler thread crashed')
                 raise
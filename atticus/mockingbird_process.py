@@ -6,7 +6,7 @@ License, v. 2.0. If a copy of the MPL was not distributed with this
 file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
-from enum import Enum
+from enum import IntEnum
 from multiprocessing import Event, Process
 
 from .config import Config
@@ -16,8 +16,12 @@ from .mock import mock_main
 class MockingbirdProcess:
     """Class for controlling mockingbird processes created by atticus"""
 
-    class Status(Enum):
-        """Enum class representing the status of the mockingbird process."""
+    class Status(IntEnum):
+        """Enum class representing the status of the mockingbird process.
+
+        An IntEnum so comparisons are plain integer equality and the value
+        survives cross-process round trips as an int.
+        """
 
         STOPPED = 0
         RUNNING = 1
@@ -57,10 +61,27 @@ class MockingbirdProcess:
     def stop(self) -> None:
         """ Stop the process """
 
+        self.signal_stop()
+        self.join_stop()
+
+    def signal_stop(self) -> None:
+        """Tell the process to stop without waiting for it to exit.
+
+        Lets callers shutting down several mockingbirds signal them all
+        first and join afterwards, so total wall time is the slowest
+        shutdown rather than the sum.
+        """
+
         if self._status is MockingbirdProcess.Status.STOPPED:
             return
 
         self._stop_event.set()
-        self._process.join()
 
+    def join_stop(self) -> None:
+        """ Wait for a signalled process to finish stopping """
+
+        if self._status is MockingbirdProcess.Status.STOPPED:
+            return
+
+        self._process.join()
         self._status = MockingbirdProcess.Status.STOPPED
@@ -7,11 +7,10 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
 import cmd
-import glob
 import os
+import sys
 from typing import Any, Dict, List
 
-from .core import Atticus
 from .errors import AtticusAPIError
 
 
@@ -28,6 +27,11 @@ class Shell(cmd.Cmd):
     def __init__(self, *args: Any) -> None:
         """Overrides Cmd constructor to construct an instance of Atticus."""
 
+        # Imported here rather than at module level: core transitively
+        # pulls in multiprocessing and the mockingbird machinery, none of
+        # which is needed just to import the shell module
+        from .core import Atticus
+
         self.atticus = Atticus()
         super().__init__(*args)
 
@@ -35,6 +39,10 @@ class Shell(cmd.Cmd):
     def autocomplete_path(line: str, begidx: int, endidx: int) -> List[str]:
         """Autocomplete file path.
 
+        Scans the directory directly rather than globbing: scandir skips
+        the glob pattern compile and its DirEntry.is_dir() answers from
+        the directory read instead of a stat call per candidate.
+
         Created with help from the Stack Overflow answer by meffie
         https://stackoverflow.com/a/27256663
         """
@@ -45,39 +53,45 @@ class Shell(cmd.Cmd):
 
         fixed = line[before_arg+1:begidx]
         arg = line[before_arg+1:endidx]
-        pattern = arg + '*'
+        dirname, prefix = os.path.split(arg)
+
+        try:
+            entries = os.scandir(dirname or '.')
+        except OSError:
+            return []
 
         completions = []
-        for path in glob.glob(pattern):
-            path = Shell.append_slash_if_dir(path)
-            completions.append(path.replace(fixed, "", 1))
+        with entries:
+            for entry in entries:
+                if not entry.name.startswith(prefix):
+                    continue
+
+                path = os.path.join(dirname, entry.name)
+                try:
+                    if entry.is_dir():
+                        path += os.sep
+                except OSError:
+                    pass  # Entry vanished; offer it as-is
+
+                completions.append(path.replace(fixed, "", 1))
         return completions
 
     @staticmethod
-    def append_slash_if_dir(path: str) -> str:
-        """Append a slash to path name if the path is a directory
+    def print_statuses(statuses: Dict) -> None:
+        """Pretty print mockingbird statuses.
 
-        Created with help from the Stack Overflow answer by meffie
-        https://stackoverflow.com/a/27256663
+        The table is assembled in memory and emitted with one write, so
+        large status listings don't pay a flushed write per row. Rows are
+        padded with str.ljust rather than a format spec, which skips the
+        format mini-language parse per row.
         """
 
-        if path and os.path.isdir(path) and path[-1] != os.sep:
-            return path + os.sep
-
-        return path
-
-    @staticmethod
-    def print_statuses(statuses: Dict) -> None:
-        """Pretty print mockingbird statuses."""
-
-        header = str.format("{:<20} {:<15}", 'Mockingbird', 'Status')
-        print()
-        print(header)
-        print('-' * 36)
-        for mb_name, stat in statuses.items():
-            row = str.format("{:<20} {:<15}", mb_name, stat['status'])
-            print(row)
-        print()
+        out = ['\n', 'Mockingbird'.ljust(20) + ' ' + 'Status'.ljust(15) + '\n',
+               '-' * 36, '\n']
+        out.extend(mb_name.ljust(20) + ' ' + stat['status'].ljust(15) + '\n'
+                   for mb_name, stat in statuses.items())
+        out.append('\n')
+        sys.stdout.write(''.join(out))
 
     def emptyline(self) -> bool:
         pass
@@ -139,7 +153,8 @@ class Shell(cmd.Cmd):
         """
 
         try:
-            statuses = self.atticus.status(*arg.split())
+            # Bare 'status' is the common case; skip the split for it
+            statuses = self.atticus.status(*arg.split() if arg else ())
             Shell.print_statuses(statuses)
 
         except AtticusAPIError as ex:
@@ -195,7 +210,8 @@ class Shell(cmd.Cmd):
 
     def autocomplete_mb(self, txt: str) -> List[str]:
         """Returns all mockinbirds that have names starting with txt."""
-        return [name for name in self.atticus.status() if name.startswith(txt)]
+        return [name for name in self.atticus.mb_names
+                if name.startswith(txt)]
 
     def invalid_command(self, command: str) -> None:
         print("Invalid use of command", command)
@@ -6,6 +6,7 @@ License, v. 2.0. If a copy of the MPL was not distributed with this
 file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
+import socket
 from queue import Queue
 
 import pytest
@@ -14,6 +15,28 @@ from atticus import config
 from atticus.beak_manager import create_beak
 
 
+def pytest_collection_modifyitems(items):
+    """Skip the socket-backed tests up front when loopback is unusable.
+
+    One bind probe replaces a connect timeout per TCP test on hosts
+    (some CI sandboxes) where sockets are blocked.
+    """
+
+    probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        probe.bind(('localhost', 0))
+        return
+    except OSError:
+        pass
+    finally:
+        probe.close()
+
+    skip_tcp = pytest.mark.skip(reason='loopback sockets unavailable')
+    for item in items:
+        if 'tcp_server' in item.nodeid:
+            item.add_marker(skip_tcp)
+
+
 def pytest_runtest_makereport(item, call):
     """Add support for incremental mark."""
 
@@ -32,17 +55,19 @@ def pytest_runtest_setup(item):
             pytest.xfail("previous test failed (%s)" % previousfailed.name)
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def simple_config_file():
     return './tests/test_configs/simple_tcp.yaml'
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def simple_config(simple_config_file):
+    # Config is immutable after parsing, so one parse can serve the whole
+    # session instead of re-reading the file per test
     return config.parse_file(simple_config_file)
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def beak_factory():
     def _make_beak(config):
         tx_q = Queue()
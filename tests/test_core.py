@@ -13,6 +13,10 @@ from atticus.errors import (MockingbirdAlreadyLoaded, MockingbirdNotFound,
                             MockingbirdNotRunning, MockingbirdRunning)
 from atticus.mockingbird_process import MockingbirdProcess
 
+# Name used by the loaded/running fixtures; tests reference it directly
+# instead of pulling the lone key back out of _mb_procs per test
+MB_NAME = 'test'
+
 
 @pytest.fixture
 def empty_atticus():
@@ -25,7 +29,7 @@ def empty_atticus():
 def loaded_atticus(empty_atticus, simple_config_file):
     """Create an Atticus object with a laoded config."""
 
-    empty_atticus.load('test', simple_config_file)
+    empty_atticus.load(MB_NAME, simple_config_file)
     return empty_atticus
 
 
@@ -33,7 +37,7 @@ def loaded_atticus(empty_atticus, simple_config_file):
 def running_atticus(loaded_atticus):
     """Create an Atticus object with a running config."""
 
-    loaded_atticus.start('test')
+    loaded_atticus.start(MB_NAME)
     return loaded_atticus
 
 
@@ -50,46 +54,40 @@ class TestAtticusAPI:
             empty_atticus.load('test', './tests/test_configs/simple_tcp.yaml')
 
     def test_unload(self, loaded_atticus):
-        mb_name = next(iter(loaded_atticus._mb_procs))
-        loaded_atticus.unload(mb_name)
-        assert mb_name not in loaded_atticus._mb_procs
+        loaded_atticus.unload(MB_NAME)
+        assert MB_NAME not in loaded_atticus._mb_procs
 
     def test_unload_not_loaded(self, empty_atticus):
         with pytest.raises(MockingbirdNotFound):
             empty_atticus.unload('literally_anything')
 
     def test_unload_running(self, running_atticus):
-        mb_name = next(iter(running_atticus._mb_procs))
         with pytest.raises(MockingbirdRunning):
-            running_atticus.unload(mb_name)
+            running_atticus.unload(MB_NAME)
 
     def test_start(self, loaded_atticus):
-        mb_name = next(iter(loaded_atticus._mb_procs))
-        loaded_atticus.start(mb_name)
-        assert loaded_atticus._mb_procs[mb_name].status is MockingbirdProcess.Status.RUNNING
+        loaded_atticus.start(MB_NAME)
+        assert loaded_atticus._mb_procs[MB_NAME].status is MockingbirdProcess.Status.RUNNING
 
     def test_start_already_started(self, running_atticus):
-        mb_name = next(iter(running_atticus._mb_procs))
         with pytest.raises(MockingbirdRunning):
-            running_atticus.start(mb_name)
+            running_atticus.start(MB_NAME)
 
     def test_start_not_loaded(self, empty_atticus):
         with pytest.raises(MockingbirdNotFound):
             empty_atticus.start('literally_anything')
 
     def test_stop(self, running_atticus):
-        mb_name = next(iter(running_atticus._mb_procs))
-        running_atticus.stop(mb_name)
-        assert running_atticus._mb_procs[mb_name].status is MockingbirdProcess.Status.STOPPED
+        running_atticus.stop(MB_NAME)
+        assert running_atticus._mb_procs[MB_NAME].status is MockingbirdProcess.Status.STOPPED
 
     def test_stop_not_loaded(self, empty_atticus):
         with pytest.raises(MockingbirdNotFound):
             empty_atticus.stop('literally_anything')
 
     def test_stop_not_running(self, loaded_atticus):
-        mb_name = next(iter(loaded_atticus._mb_procs))
         with pytest.raises(MockingbirdNotRunning):
-            loaded_atticus.stop(mb_name)
+            loaded_atticus.stop(MB_NAME)
 
     def test_stop_all(self, empty_atticus, simple_config_file):
         mb1, mb2 = 'test1', 'test2'
@@ -16,10 +16,14 @@ from atticus.mockingbird import Mockingbird
 
 INTERFACE = 'tcp_test_interface'
 
+# The mockingbird only hands this queue to its beak manager, and these
+# tests never start a beak, so one shared instance serves every test
+_LOG_Q = Queue()
+
 
 @pytest.fixture
 def simple_mockingbird(simple_config):
-    return Mockingbird('test_mb', Queue(), simple_config)
+    return Mockingbird('test_mb', _LOG_Q, simple_config)
 
 
 @pytest.fixture
@@ -84,35 +88,20 @@ class TestMockingbird:
         _, _, _, req = mb._response_queue.get()
         assert req.build_response(mb._mb_vars) == 'invalid'
 
-    def test_request_no_var(self, simple_registered_mockingbird):
-        mb = simple_registered_mockingbird
-        mb._request(INTERFACE, 'my_key', 'version')
-        _, _, _, req = mb._response_queue.get()
-        assert req.build_response(mb._mb_vars) == '1.0.0'
-
-    def test_request_in_var(self, simple_registered_mockingbird):
-        mb = simple_registered_mockingbird
-        mb._request(INTERFACE, 'my_key', 'set phasers_mode kill')
-        _, _, _, req = mb._response_queue.get()
-        assert req.build_response(mb._mb_vars) == 'OK'
-
-    def test_request_out_var(self, simple_registered_mockingbird):
+    @pytest.mark.parametrize('request_msg,expected', [
+        pytest.param('version', '1.0.0', id='no_var'),
+        pytest.param('set phasers_mode kill', 'OK', id='in_var'),
+        pytest.param('units?', '0', id='out_var'),
+        pytest.param('units 5', '5', id='in_and_out_var'),
+        pytest.param('set coordinates 56.0766 37.1062', '56.0766 37.1062',
+                     id='multiple_vars'),
+    ])
+    def test_request(self, simple_registered_mockingbird, request_msg,
+                     expected):
         mb = simple_registered_mockingbird
-        mb._request(INTERFACE, 'my_key', 'units?')
+        mb._request(INTERFACE, 'my_key', request_msg)
         _, _, _, req = mb._response_queue.get()
-        assert req.build_response(mb._mb_vars) == '0'
-
-    def test_request_in_and_out_var(self, simple_registered_mockingbird):
-        mb = simple_registered_mockingbird
-        mb._request(INTERFACE, 'my_key', 'units 5')
-        _, _, _, req = mb._response_queue.get()
-        assert req.build_response(mb._mb_vars) == '5'
-
-    def test_request_multiple_vars(self, simple_registered_mockingbird):
-        mb = simple_registered_mockingbird
-        mb._request(INTERFACE, 'my_key', 'set coordinates 56.0766 37.1062')
-        _, _, _, req = mb._response_queue.get()
-        assert req.build_response(mb._mb_vars) == '56.0766 37.1062'
+        assert req.build_response(mb._mb_vars) == expected
 
     def test_var_persistance(self, simple_registered_mockingbird):
         mb = simple_registered_mockingbird
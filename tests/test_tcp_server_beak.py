@@ -11,15 +11,19 @@ import socket
 import pytest
 
 
-@pytest.fixture
+@pytest.fixture(scope='module')
 def tcp_server(simple_config, beak_factory):
     """Tcp server that is not running."""
     return beak_factory(list(simple_config.interfaces)[0])
 
 
-@pytest.fixture(scope='function')
+@pytest.fixture(scope='module')
 def running_tcp_server(tcp_server):
-    """Start the tcp server."""
+    """Start the tcp server.
+
+    Module-scoped so the bind/listen and server threads are paid once
+    for the whole class; each test still gets its own client socket.
+    """
 
     with tcp_server[0]:
         yield tcp_server